@@ -0,0 +1,2 @@
+# Marks the repository root for pytest, which puts this directory on sys.path so the
+# tests can import the top-level modules (main, memory_utils, ...) under plain `pytest`.
@@ -81,7 +81,7 @@ class DataCleaning:
         return user_df
     
     @staticmethod
-    def clean_card_data(card_df):
+    def clean_card_data(card_df, seen_rows=None):
         """Cleans card data by doing the following:
         - Converts "card_number" (NULL) string values to NULL data type.
         - Removes NULL values.
@@ -91,6 +91,9 @@ class DataCleaning:
         
         Args:
             card_df (pd.DataFrame): Raw card data.
+            seen_rows (set, optional): Hashes of rows kept from earlier chunks of the same data.
+                When given, rows already seen are dropped and this chunk's rows are added, so
+                duplicates are removed across chunks exactly as for the whole data at once.
         
         Returns:
             pd.DataFrame: cleaned card_df"""
@@ -106,6 +109,12 @@ class DataCleaning:
 
         # Drop duplicate values
         card_df = card_df.drop_duplicates()
+        
+        # Drop rows that duplicate a row from an earlier chunk
+        if seen_rows is not None:
+            row_hashes = pd.util.hash_pandas_object(card_df, index=False)
+            card_df = card_df[~row_hashes.isin(seen_rows)].copy()
+            seen_rows.update(row_hashes)
 
         # Detect invalid card providers
         valid_card_providers = ['VISA 16 digit', 'JCB 16 digit', 'VISA 13 digit', 'JCB 15 digit', 'VISA 19 digit', 'Diners Club / Carte Blanche',
@@ -330,6 +339,8 @@ class DataCleaning:
         - Removing invalid 'time_period' entries.
         - Replacing 'NULL' strings with NaN.
         - Dropping null rows.
+        - Deriving a UTC 'full_timestamp' and a 'year_month' key (first day of the month)
+          used to partition the orders table.
 
         Args:
             events_df (pd.DataFrame): Raw events data.
@@ -347,4 +358,21 @@ class DataCleaning:
         events_df = events_df.replace('NULL', np.nan)
         events_df = events_df.dropna()
         
+        # Combine year/month/day/timestamp into one timezone-aware timestamp, so queries
+        # no longer need to CONCAT and TO_TIMESTAMP every row:
+        date_parts = events_df[['year', 'month', 'day']].apply(pd.to_numeric, errors='coerce')
+        event_dates = pd.to_datetime(date_parts, errors='coerce')
+        # pd.read_json parses a column named 'timestamp' as datetimes, so keep only the time of day
+        event_clock = events_df['timestamp']
+        if pd.api.types.is_datetime64_any_dtype(event_clock):
+            event_clock = event_clock.dt.strftime('%H:%M:%S.%f')
+        event_times = pd.to_timedelta(event_clock.astype(str), errors='coerce')
+        events_df['full_timestamp'] = (event_dates + event_times).dt.tz_localize('UTC')
+        
+        # Year-month key (stored as a DATE) for range partitioning:
+        events_df['year_month'] = pd.to_datetime(date_parts.assign(day=1), errors='coerce').dt.date
+        
+        # Drop rows whose date or time could not be parsed:
+        events_df = events_df.dropna(subset=['full_timestamp'])
+        
         return events_df
\ No newline at end of file
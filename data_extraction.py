@@ -1,8 +1,6 @@
-import pandas as pd
-import sqlalchemy
-import tabula
-import requests
-import boto3, botocore
+# Heavy third-party modules are imported inside the methods that use them, so
+# each pipeline only pays for the libraries it actually needs (e.g. the events
+# job never starts tabula's JVM wrapper or loads SQLAlchemy).
 
 class DataExtractor:
     def __init__(self, engine=None): 
@@ -10,37 +8,92 @@ class DataExtractor:
         self.engine = engine
         
         
-    def read_rds_table(self, table_name):
+    def read_rds_table_in_chunks(self, table_name, memory_budget):
         """
-        Reads a table from the RDS database using the provided engine.
+        Reads a table from the RDS database in chunks sized to fit the memory budget.
 
         Args:
-            db_engine (sqlalchemy.Engine): Database engine.
             table_name (str): Name of the table to read.
+            memory_budget (MemoryBudget): Budget used to size each chunk.
 
-        Returns:
-            pd.DataFrame: The extracted table as a DataFrame.
+        Yields:
+            pd.DataFrame: Chunks of the table.
         """
+        import pandas as pd
+        import sqlalchemy
+
         with self.engine.connect() as connection:
             query = sqlalchemy.text("SELECT * FROM {}".format(table_name))
-            result = connection.execute(query)
-            user_df = pd.DataFrame(result.fetchall(), columns=result.keys())
-        return user_df
+            # Server-side cursor, so rows are only fetched as each chunk is requested
+            result = connection.execution_options(stream_results=True).execute(query)
+            columns = list(result.keys())
+
+            def read_chunk(n_rows):
+                rows = result.fetchall() if n_rows is None else result.fetchmany(n_rows)
+                if not rows:
+                    return None
+                return pd.DataFrame(rows, columns=columns)
+
+            yield from memory_budget.iter_chunks(read_chunk)
     
     @staticmethod
-    def retrieve_pdf_data(pdf_url):
+    def retrieve_pdf_data_in_chunks(pdf_url, memory_budget):
         """
-        Downloads and extracts tabular data from a PDF link.
+        Downloads a PDF once and extracts its tables a few pages at a time,
+        with the number of pages per chunk sized to fit the memory budget.
 
         Args:
-            link (str): URL of the PDF file.
+            pdf_url (str): URL of the PDF file.
+            memory_budget (MemoryBudget): Budget used to size each chunk.
 
-        Returns:
-            pd.DataFrame: Extracted data from the PDF.
+        Yields:
+            pd.DataFrame: Extracted data from consecutive page ranges.
         """
-        card_df = tabula.read_pdf(pdf_url, output_format='dataframe', pages='all')
-        card_df = pd.concat(card_df, ignore_index=True)
-        return card_df
+        import math
+        import os
+        import tempfile
+        import pandas as pd
+        import requests
+        import tabula
+        from pypdf import PdfReader
+
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
+            with requests.get(pdf_url, stream=True) as response:
+                response.raise_for_status()
+                for block in response.iter_content(chunk_size=1024 * 1024):
+                    pdf_file.write(block)
+
+        try:
+            page_count = len(PdfReader(pdf_file.name).pages)
+            next_page = 1
+            rows_per_page = None
+
+            def read_chunk(n_rows):
+                nonlocal next_page, rows_per_page
+                if next_page > page_count:
+                    return None
+                if n_rows is None: # No budget, so read every page in one go
+                    n_pages = page_count
+                elif rows_per_page is None: # Probe with a single page
+                    n_pages = 1
+                else:
+                    n_pages = max(math.ceil(n_rows / rows_per_page), 1)
+                # Never ask tabula for a page past the end of the PDF
+                last_page = min(next_page + n_pages - 1, page_count)
+                # Read every column as text: each page range is parsed separately, so inferred
+                # types (e.g. card_number as int64) would otherwise vary from chunk to chunk
+                tables = tabula.read_pdf(pdf_file.name, output_format='dataframe',
+                                         pages=f'{next_page}-{last_page}', pandas_options={'dtype': str})
+                chunk = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+                # Pages without tables don't tell us anything about rows per page
+                if len(chunk):
+                    rows_per_page = len(chunk) / (last_page - next_page + 1)
+                next_page = last_page + 1
+                return chunk
+
+            yield from memory_budget.iter_chunks(read_chunk)
+        finally:
+            os.remove(pdf_file.name)
         
     @staticmethod    
     def list_number_of_stores(endpoint, headers):
@@ -54,6 +107,8 @@ class DataExtractor:
         Returns:
             int: Total number of stores.
         """
+        import requests
+
         response = requests.get(endpoint, headers=headers)
         response.raise_for_status()
         return response.json()['NUMBER_OF_STORES_KEY'] # Need to confirm correct key so that total number of stores is returned
@@ -71,6 +126,9 @@ class DataExtractor:
         Returns:
             pd.DataFrame: Store data as a DataFrame.
         """
+        import pandas as pd
+        import requests
+
         stores = []
         for store_number in range(total_stores):
             url = f"{store_endpoint}{store_number}"
@@ -79,10 +137,10 @@ class DataExtractor:
             stores.append(response.json())
         return pd.DataFrame(stores)
     
-    @staticmethod    
-    def extract_from_s3(bucket_name, bucket_file, local_path):
+    @staticmethod
+    def _download_from_s3(bucket_name, bucket_file, local_path):
         """
-        Reads a CSV file stored in an S3 bucket.
+        Downloads a file from an S3 bucket.
 
         Args:
             bucket_name (str): Full name of bucket.
@@ -90,30 +148,126 @@ class DataExtractor:
             local_path (str): Local directory to specify save location for file.
 
         Returns:
-            pd.DataFrame: Extracted data from S3.
+            bool: True if the file was downloaded.
         """
+        import boto3
+        from botocore.exceptions import ClientError, NoCredentialsError
+
         s3 = boto3.client('s3')
                 
         try:
             s3.download_file(bucket_name, bucket_file, local_path)
-        except botocore.NoCredentialsError:
+        except NoCredentialsError:
             print("AWS credentials not found. Please configure your credentials.")
-            return None
-        except botocore.ClientError as e:
+            return False
+        except ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchBucket':
                 print("The specified bucket does not exist.")
             else:
                 print("An error occurred:", e)
-            return None
+            return False
+        return True
+    
+    @staticmethod
+    def extract_from_s3_in_chunks(bucket_name, bucket_file, local_path, memory_budget):
+        """
+        Downloads a CSV or JSON file from an S3 bucket and parses it in chunks
+        sized to fit the memory budget, rather than loading the whole file.
+
+        Args:
+            bucket_name (str): Full name of bucket.
+            bucket_file (str): Full name of file within bucket.
+            local_path (str): Local directory to specify save location for file.
+            memory_budget (MemoryBudget): Budget used to size each chunk.
+
+        Yields:
+            pd.DataFrame: Chunks of the file.
+        """
+        import pandas as pd
+
+        if not DataExtractor._download_from_s3(bucket_name, bucket_file, local_path):
+            return
         
         if local_path.endswith('.csv'):
-            df = pd.read_csv(local_path, usecols=lambda x: x != 'Unnamed: 0')
-            return df
+            # Read every column as text, so each chunk has the same schema (types inferred per
+            # chunk can differ, and later chunks are appended to the table the first one created)
+            with pd.read_csv(local_path, usecols=lambda x: x != 'Unnamed: 0', dtype=str, iterator=True) as reader:
+
+                def read_chunk(n_rows):
+                    try:
+                        return reader.get_chunk(n_rows)
+                    except StopIteration:
+                        return None
+
+                yield from memory_budget.iter_chunks(read_chunk)
         
         elif local_path.endswith('.json'):
-            df = pd.read_json(local_path)
-            return df
+            yield from DataExtractor._read_json_in_chunks(local_path, memory_budget)
         
         else:
             print("Error loading file. Please ensure file is .csv or .json file type")
-            return None
\ No newline at end of file
+    
+    @staticmethod
+    def _read_json_in_chunks(local_path, memory_budget):
+        """
+        Parses a JSON file in chunks with the ijson streaming parser.
+        Handles both a list of records and pandas' column layout ({column: {index: value}}),
+        which is streamed by reading every column through its own file handle in step.
+        Without a memory limit the file is loaded in one go with pd.read_json instead.
+
+        Args:
+            local_path (str): Path to the JSON file.
+            memory_budget (MemoryBudget): Budget used to size each chunk.
+
+        Yields:
+            pd.DataFrame: Chunks of the file.
+
+        Raises:
+            ImportError: If a memory limit is set and ijson is not installed.
+        """
+        from itertools import islice
+        import pandas as pd
+
+        if memory_budget.limit_bytes is None:
+            # Keep values as text, matching what ijson returns when streaming
+            yield pd.read_json(local_path, dtype=False, convert_dates=False)
+            return
+
+        try:
+            import ijson
+        except ImportError:
+            raise ImportError("ijson is required to read JSON files under --memory-budget. "
+                              "Install it with 'pip install ijson'.") from None
+
+        with open(local_path, 'rb') as f:
+            _, first_event, _ = next(ijson.parse(f))
+
+        if first_event == 'start_array':
+            with open(local_path, 'rb') as f:
+                records = ijson.items(f, 'item', use_float=True)
+
+                def read_records(n_rows):
+                    chunk_records = list(islice(records, n_rows))
+                    return pd.DataFrame.from_records(chunk_records) if chunk_records else None
+
+                yield from memory_budget.iter_chunks(read_records)
+            return
+
+        with open(local_path, 'rb') as f:
+            columns = [value for prefix, event, value in ijson.parse(f) if prefix == '' and event == 'map_key']
+        files = [open(local_path, 'rb') for _ in columns]
+        try:
+            column_items = [ijson.kvitems(f, column, use_float=True) for f, column in zip(files, columns)]
+
+            def read_chunk(n_rows):
+                column_pairs = [list(islice(items, n_rows)) for items in column_items]
+                if not column_pairs or not column_pairs[0]:
+                    return None
+                index = [key for key, _ in column_pairs[0]]
+                data = {column: [value for _, value in pairs] for column, pairs in zip(columns, column_pairs)}
+                return pd.DataFrame(data, index=index)
+
+            yield from memory_budget.iter_chunks(read_chunk)
+        finally:
+            for f in files:
+                f.close()
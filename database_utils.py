@@ -1,8 +1,4 @@
 import yaml
-import sqlalchemy
-from sqlalchemy import inspect
-import psycopg2
-import pandas as pd
 
 class DatabaseConnector:
     def __init__(self, yaml_file):
@@ -53,6 +49,8 @@ class DatabaseConnector:
         
         connection_string = f"{db_type}+{dbapi}://{user}:{password}@{host}:{port}/{database}"
      
+        import sqlalchemy
+
         try:
             engine = sqlalchemy.create_engine(connection_string)
             return engine
@@ -69,6 +67,8 @@ class DatabaseConnector:
         Returns:
             None
             """
+        from sqlalchemy import inspect
+
         inspector = inspect(engine)
         table_names = inspector.get_table_names()
         print("Available tables:")
@@ -76,23 +76,26 @@ class DatabaseConnector:
             print(f"{idx}. {table}")
         return None
     
-    def upload_to_db(self, df_to_upload, new_db_name, engine=None):
+    def upload_to_db(self, df_to_upload, new_db_name, engine=None, if_exists='replace'):
         """
         Uploads a DataFrame to the database into the specified table.
 
         Args:
             df (pd.DataFrame): The DataFrame to upload.
             table_name (str): Name of the target table in the database.
+            if_exists (str): 'replace' to recreate the table, or 'append' to add rows
+                (used for every chunk after the first).
 
         Returns:
-            None
+            bool: True if the upload succeeded.
         """        
         if engine is None:
             engine = self.init_db_engine()
         
         try:
-            df_to_upload.to_sql(new_db_name, engine, if_exists='replace', index=False)
+            df_to_upload.to_sql(new_db_name, engine, if_exists=if_exists, index=False)
             print("table uploaded successfully.")
         except Exception as e:
             print(f"Error uploading table: {e}")
-        return None
\ No newline at end of file
+            return False
+        return True
\ No newline at end of file
@@ -1,97 +1,164 @@
-from data_extraction import DataExtractor
-from data_cleaning import DataCleaning
-from database_utils import DatabaseConnector
+import argparse
 import sys
+from memory_utils import ChunkSpool, MemoryBudget
+
+# The pipeline modules (and the pandas/SQLAlchemy/boto3/tabula stack behind them)
+# are imported inside each run_* function, so starting the menu or running a
+# single job only loads what that job needs.
 
 yaml_directory = r"C:\Users\comma\VS Code projects\Python projects\mnrdc_project\MNRDC_project\db_creds.yaml"
 local_yaml_directory = r"C:\Users\comma\VS Code projects\Python projects\mnrdc_project\MNRDC_project\local_db_creds.yaml"
 pdf_url = r'https://data-handling-public.s3.eu-west-1.amazonaws.com/card_details.pdf'
 
 
-def run_user_data():
+def run_user_data(memory_budget):
     """
     Extracts, cleans, and optionally uploads user data to the local database.
+
+    Args:
+        memory_budget (MemoryBudget): Budget used to size chunks; with no limit the data is processed in one go.
     """
+    from data_extraction import DataExtractor
+    from data_cleaning import DataCleaning
+    from database_utils import DatabaseConnector
+
     db_connector = DatabaseConnector(yaml_directory)
     engine = db_connector.init_db_engine()
     table_name = 'legacy_users'       
     extractor = DataExtractor(engine)
-    user_df = extractor.read_rds_table(table_name)    
+    user_chunks = extractor.read_rds_table_in_chunks(table_name, memory_budget)
     cleaner = DataCleaning()
-    cleaned_user_df = cleaner.clean_user_data(user_df)
-    print("User data successfully cleaned")
-    ask_and_upload(cleaned_user_df, "dim_users")
+    cleaned_user_chunks = (cleaner.clean_user_data(user_df) for user_df in user_chunks)
+    clean_and_upload(cleaned_user_chunks, "dim_users", "User data", memory_budget)
     
-def run_card_data():
+def run_card_data(memory_budget):
     """
     Extracts, cleans, and optionally uploads card data from a PDF to the local database.
+
+    Args:
+        memory_budget (MemoryBudget): Budget used to size chunks; with no limit the data is processed in one go.
     """
+    from data_extraction import DataExtractor
+    from data_cleaning import DataCleaning
+
     pdf_url=r'https://data-handling-public.s3.eu-west-1.amazonaws.com/card_details.pdf'
-    card_df = DataExtractor.retrieve_pdf_data(pdf_url)
-    cleaned_card_df = DataCleaning.clean_card_data(card_df)
-    print("Card data successfully cleaned")
-    ask_and_upload(cleaned_card_df, "dim_card_details")
+    card_chunks = DataExtractor.retrieve_pdf_data_in_chunks(pdf_url, memory_budget)
+    # Shared across chunks so duplicate rows are removed as if the PDF were cleaned in one go
+    seen_card_rows = set()
+    cleaned_card_chunks = (DataCleaning.clean_card_data(card_df, seen_card_rows) for card_df in card_chunks)
+    clean_and_upload(cleaned_card_chunks, "dim_card_details", "Card data", memory_budget)
 
-def run_store_data():
+def run_store_data(memory_budget):
     """
     Extracts, cleans, and optionally uploads store data to the local database.
+
+    Args:
+        memory_budget (MemoryBudget): Budget used to size chunks; with no limit the data is processed in one go.
     """
+    from data_extraction import DataExtractor
+    from data_cleaning import DataCleaning
+    from database_utils import DatabaseConnector
+
     db_connector = DatabaseConnector(yaml_directory)
     engine = db_connector.init_db_engine()
     table_name = 'legacy_store_details'       
     extractor = DataExtractor(engine)
-    stores_df = extractor.read_rds_table(table_name)
-    cleaned_stores_df = DataCleaning.clean_stores_data(stores_df)
-    print("Store data successfully cleaned")
-    ask_and_upload(cleaned_stores_df, "dim_store_details")
+    stores_chunks = extractor.read_rds_table_in_chunks(table_name, memory_budget)
+    cleaned_stores_chunks = (DataCleaning.clean_stores_data(stores_df) for stores_df in stores_chunks)
+    clean_and_upload(cleaned_stores_chunks, "dim_store_details", "Store data", memory_budget)
         
-def run_products_data():
+def run_products_data(memory_budget):
     """
     Extracts, cleans, and optionally uploads product data from S3 to the local database.
+
+    Args:
+        memory_budget (MemoryBudget): Budget used to size chunks; with no limit the data is processed in one go.
     """
+    from data_extraction import DataExtractor
+    from data_cleaning import DataCleaning
+
     local_path = r'C:\Users\comma\VS Code projects\Python projects\mnrdc_project\MNRDC_project\products.csv'
-    products_df = DataExtractor.extract_from_s3('data-handling-public', 'products.csv', local_path)
-    cleaned_products_df = DataCleaning.clean_product_data(products_df)
-    fixed_weights_df = DataCleaning.convert_product_weights(cleaned_products_df)
-    print("Products data successfully cleaned")
-    ask_and_upload(fixed_weights_df, "dim_products")
+    products_chunks = DataExtractor.extract_from_s3_in_chunks('data-handling-public', 'products.csv', local_path, memory_budget)
+    fixed_weights_chunks = (DataCleaning.convert_product_weights(DataCleaning.clean_product_data(products_df))
+                            for products_df in products_chunks)
+    clean_and_upload(fixed_weights_chunks, "dim_products", "Products data", memory_budget)
         
-def run_orders_data():
+def run_orders_data(memory_budget):
     """
     Extracts, cleans, and optionally uploads order data to the local database.
+
+    Args:
+        memory_budget (MemoryBudget): Budget used to size chunks; with no limit the data is processed in one go.
     """
+    from data_extraction import DataExtractor
+    from data_cleaning import DataCleaning
+    from database_utils import DatabaseConnector
+
     table_name = 'orders_table'
     connector = DatabaseConnector(yaml_directory)
     engine = connector.init_db_engine()
     extractor = DataExtractor(engine)
-    orders_df = extractor.read_rds_table(table_name)
-    cleaned_orders_df = DataCleaning.clean_orders_data(orders_df)
-    print("Orders data successfully cleaned")
-    ask_and_upload(cleaned_orders_df, "dim_orders_details")
+    orders_chunks = extractor.read_rds_table_in_chunks(table_name, memory_budget)
+    cleaned_orders_chunks = (DataCleaning.clean_orders_data(orders_df) for orders_df in orders_chunks)
+    clean_and_upload(cleaned_orders_chunks, "dim_orders_details", "Orders data", memory_budget)
     
-def run_events_data():
+def run_events_data(memory_budget):
     """
     Extracts, cleans, and optionally uploads event data from S3 to the local database.
+
+    Args:
+        memory_budget (MemoryBudget): Budget used to size chunks; with no limit the data is processed in one go.
     """
+    from data_extraction import DataExtractor
+    from data_cleaning import DataCleaning
+
     local_path = r"C:\Users\comma\VS Code projects\Python projects\mnrdc_project\MNRDC_project\date_details.json"
-    events_df = DataExtractor.extract_from_s3('data-handling-public', 'date_details.json', local_path)
-    cleaned_events_df = DataCleaning.clean_events_data(events_df)
-    print("Events data successfully cleaned")    
-    ask_and_upload(cleaned_events_df, "dim_date_times")
+    events_chunks = DataExtractor.extract_from_s3_in_chunks('data-handling-public', 'date_details.json', local_path, memory_budget)
+    cleaned_events_chunks = (DataCleaning.clean_events_data(events_df) for events_df in events_chunks)
+    clean_and_upload(cleaned_events_chunks, "dim_date_times", "Events data", memory_budget)
  
-def ask_and_upload(df, table_name):
+def clean_and_upload(cleaned_chunks, table_name, dataset_name, memory_budget):
     """
-    Asks the user if they want to upload the cleaned DataFrame to the local database.
+    Runs the extraction and cleaning of every chunk, reports the result, then asks whether to upload it.
+    Under a memory budget the cleaned chunks are kept in temporary files until they are uploaded.
 
     Args:
-        df (pd.DataFrame): The cleaned data to be uploaded.
+        cleaned_chunks (iterable of pd.DataFrame): Cleaned data, chunk by chunk.
+        table_name (str): The target table name in the database.
+        dataset_name (str): Name used in messages, e.g. 'User data'.
+        memory_budget (MemoryBudget): Decides whether chunks are kept on disk, and is reported with the peak RSS.
+    """
+    job_only = memory_budget.reset_peak_rss()
+    with ChunkSpool(cleaned_chunks, on_disk=memory_budget.limit_bytes is not None) as cleaned:
+        if not cleaned:
+            print(f"No {dataset_name.lower()} was extracted, so there is nothing to upload")
+        else:
+            print(f"{dataset_name} successfully cleaned ({cleaned.row_count} rows)")
+            ask_and_upload(cleaned, table_name)
+    memory_budget.log_peak_rss(dataset_name, job_only)
+ 
+def ask_and_upload(chunks, table_name):
+    """
+    Asks the user if they want to upload the cleaned data to the local database.
+
+    Args:
+        chunks (iterable of pd.DataFrame): The cleaned data to be uploaded, chunk by chunk.
         table_name (str): The target table name in the database.
     """
     while True:
         upload_choice = input("Would you like to upload cleaned data? Y or N: ").casefold()
         if upload_choice == "y":
+            from database_utils import DatabaseConnector
+
             connector = DatabaseConnector(local_yaml_directory)
-            connector.upload_to_db(df, table_name)
+            engine = connector.init_db_engine()
+            for chunk_number, df in enumerate(chunks):
+                # First chunk recreates the table, the rest are appended to it
+                if_exists = 'replace' if chunk_number == 0 else 'append'
+                if not connector.upload_to_db(df, table_name, engine, if_exists=if_exists):
+                    # Don't append later chunks to a stale or partly uploaded table
+                    print(f"Upload stopped at chunk {chunk_number + 1}; {table_name} is incomplete.")
+                    break
             break
         elif upload_choice == "n":
             break
@@ -111,19 +178,48 @@ def display_menu():
     print("6  Events Data")
     print("0  Exit\n")
 
+# Menu number -> (subcommand name, runner)
+DATASETS = {
+    "1": ("users", run_user_data),
+    "2": ("cards", run_card_data),
+    "3": ("stores", run_store_data),
+    "4": ("products", run_products_data),
+    "5": ("orders", run_orders_data),
+    "6": ("events", run_events_data),
+}
+
+def run_subcommand(name, memory_budget):
+    """
+    Runs a single dataset job by name, skipping the interactive menu.
+
+    Args:
+        name (str): Subcommand name, e.g. 'events' (see DATASETS).
+        memory_budget (MemoryBudget): Budget passed to the job.
+    """
+    subcommands = {sub_name: runner for sub_name, runner in DATASETS.values()}
+    subcommands[name](memory_budget)
+
 def main():
     """
     Main execution loop:
     Displays the menu, handles user input, and runs the corresponding data processing function.
-    """
-    runners = {
-        "1": run_user_data,
-        "2": run_card_data,
-        "3": run_store_data,
-        "4": run_products_data,
-        "5": run_orders_data,
-        "6": run_events_data,
-    }
+    If a dataset name is given on the command line (e.g. `python main.py events`),
+    that job is run directly instead.
+    """
+    parser = argparse.ArgumentParser(description="Extract, clean and upload MNRDC datasets.")
+    parser.add_argument("dataset", nargs="?", choices=[name for name, _ in DATASETS.values()],
+                        help="Dataset to process. Shows the menu if omitted.")
+    parser.add_argument("--memory-budget", type=MemoryBudget.parse_size,
+                        help="Memory available for data, e.g. 512M or 2G. Sources are read, cleaned "
+                             "and uploaded in chunks sized to fit it.")
+    args = parser.parse_args()
+    memory_budget = MemoryBudget(args.memory_budget)
+
+    if args.dataset:
+        run_subcommand(args.dataset, memory_budget)
+        return
+
+    runners = {number: runner for number, (_, runner) in DATASETS.items()}
     
     while True:
         display_menu()
@@ -135,7 +231,7 @@ def main():
 
         runner_func = runners.get(choice)
         if runner_func:
-            runner_func()
+            runner_func(memory_budget)
         else:
             print("\nInvalid choice. Please select a valid number.\n")
             
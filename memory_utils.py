@@ -0,0 +1,211 @@
+import os
+import shutil
+import sys
+import tempfile
+
+SIZE_UNITS = {"B": 1, "K": 1024, "KB": 1024, "M": 1024 ** 2, "MB": 1024 ** 2, "G": 1024 ** 3, "GB": 1024 ** 3}
+
+class MemoryBudget:
+    # Rows read before bytes per row is known
+    PROBE_ROWS = 1000
+    # Share of the budget one raw chunk may use, leaving room for the copies made while cleaning
+    CHUNK_FRACTION = 0.25
+
+    def __init__(self, limit=None):
+        """
+        Initialises the MemoryBudget with an optional limit.
+
+        Args:
+            limit (str or int, optional): Memory available for data, e.g. '512MB' or a number of bytes.
+                None means no limit, so sources are read in a single chunk.
+        """
+        self.limit_bytes = self.parse_size(limit) if isinstance(limit, str) else limit
+
+    @staticmethod
+    def parse_size(size):
+        """
+        Converts a human-readable size into bytes.
+
+        Args:
+            size (str): Size such as '512MB', '512M', '2G' or '1048576'.
+
+        Returns:
+            int: Size in bytes.
+
+        Raises:
+            ValueError: If the size is not a positive number with an optional B/K/M/G suffix.
+        """
+        text = size.strip().upper()
+        multiplier = 1
+        for unit in sorted(SIZE_UNITS, key=len, reverse=True):
+            if text.endswith(unit):
+                text, multiplier = text[:-len(unit)], SIZE_UNITS[unit]
+                break
+        size_bytes = int(float(text) * multiplier)
+        if size_bytes <= 0:
+            raise ValueError(f"memory size must be positive: {size!r}")
+        return size_bytes
+
+    @staticmethod
+    def bytes_per_row(df):
+        """
+        Measures the in-memory size of one row of a DataFrame, including string contents.
+
+        Args:
+            df (pd.DataFrame): A non-empty chunk of data.
+
+        Returns:
+            float: Average bytes per row.
+        """
+        return df.memory_usage(deep=True).sum() / max(len(df), 1)
+
+    def chunk_rows(self, bytes_per_row):
+        """
+        Calculates how many rows fit into one chunk under the budget.
+
+        Args:
+            bytes_per_row (float): Measured size of one row.
+
+        Returns:
+            int or None: Rows per chunk, or None if there is no limit.
+        """
+        if self.limit_bytes is None:
+            return None
+        return max(int(self.limit_bytes * self.CHUNK_FRACTION // max(bytes_per_row, 1)), 1)
+
+    def iter_chunks(self, read_chunk):
+        """
+        Reads a source in chunks sized to the budget.
+        The first chunk is a small probe used to measure bytes per row; each later chunk
+        is re-measured so the size adapts if rows get wider.
+
+        Args:
+            read_chunk (callable): Takes a number of rows (None for all remaining rows) and
+                returns the next DataFrame, or None when the source is exhausted.
+                Empty DataFrames are skipped, e.g. PDF pages without a table.
+
+        Yields:
+            pd.DataFrame: Chunks of the source data.
+        """
+        n_rows = None if self.limit_bytes is None else self.PROBE_ROWS
+        while True:
+            chunk = read_chunk(n_rows)
+            if chunk is None:
+                return
+            if chunk.empty:
+                continue
+            if n_rows is not None:
+                n_rows = self.chunk_rows(self.bytes_per_row(chunk))
+            yield chunk
+
+    @staticmethod
+    def peak_rss():
+        """
+        Returns the peak resident set size of this process.
+
+        Returns:
+            int or None: Peak RSS in bytes, or None if it cannot be measured on this platform.
+        """
+        # On Linux, VmHWM is this process's own peak (ru_maxrss also counts the parent's
+        # memory at fork) and can be reset between jobs with reset_peak_rss()
+        try:
+            with open("/proc/self/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+
+        try:
+            import resource
+        except ImportError: # Windows
+            try:
+                import psutil
+            except ImportError:
+                return None
+            return psutil.Process().memory_info().peak_wset
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes on Linux
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    @staticmethod
+    def reset_peak_rss():
+        """
+        Resets the peak RSS to the current RSS, so the next reading covers only what follows.
+        Only supported on Linux.
+
+        Returns:
+            bool: True if the peak was reset.
+        """
+        try:
+            with open("/proc/self/clear_refs", "w") as clear_refs:
+                clear_refs.write("5")
+        except OSError:
+            return False
+        return True
+
+    def log_peak_rss(self, label, job_only):
+        """
+        Prints the peak RSS reached, alongside the budget if one is set.
+
+        Args:
+            label (str): Name of the job being reported.
+            job_only (bool): True if the peak was reset when the job started, so the reading is
+                the job's own peak. Otherwise it is the peak of the whole process so far, which
+                in menu mode can come from an earlier job.
+        """
+        peak = self.peak_rss()
+        if peak is None:
+            print(f"{label}: peak RSS not available on this platform")
+            return
+        scope = "job peak RSS" if job_only else "process peak RSS so far"
+        message = f"{label}: {scope} {peak / SIZE_UNITS['MB']:.1f}MB"
+        if self.limit_bytes is not None:
+            message += f", memory budget {self.limit_bytes / SIZE_UNITS['MB']:.1f}MB"
+        print(message)
+
+
+class ChunkSpool:
+    def __init__(self, chunks, on_disk):
+        """
+        Consumes an iterable of DataFrames so that all of its work (e.g. cleaning) is done up
+        front, keeping the chunks to be read back later. With on_disk, each chunk is pickled to
+        a temporary directory, so only one chunk is held in memory at a time.
+        Use as a context manager so the temporary directory is removed.
+
+        Args:
+            chunks (iterable of pd.DataFrame): Chunks to store.
+            on_disk (bool): Store chunks in temporary files rather than in memory.
+        """
+        self.directory = tempfile.mkdtemp(prefix="mnrdc_chunks_") if on_disk else None
+        self.chunks = []
+        self.row_count = 0
+        try:
+            for df in chunks:
+                self.row_count += len(df)
+                if self.directory is None:
+                    self.chunks.append(df)
+                else:
+                    path = os.path.join(self.directory, f"{len(self.chunks)}.pkl")
+                    df.to_pickle(path)
+                    self.chunks.append(path)
+        except BaseException:
+            self.__exit__()
+            raise
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def __iter__(self):
+        import pandas as pd
+
+        for chunk in self.chunks:
+            yield chunk if self.directory is None else pd.read_pickle(chunk)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,82 @@
+-- Latency benchmarks for the partitioned dim_orders_table.
+-- Run after mnrdc_project.session.sql. Each pair runs the legacy form (string date
+-- columns in dim_date_times) and the new form (full_timestamp / year_month on the
+-- partitioned orders table). Compare "Execution Time" at the bottom of each plan,
+-- and check the partitioned plans only scan the partitions they need (in 1.2,
+-- each loop should show "Subplans Removed" for every other year's partition).
+
+-- 1. Average time between transactions (query 9)
+-- 1.1 Before: rebuild timestamps from strings, one global LEAD() sort
+EXPLAIN (ANALYZE, BUFFERS)
+WITH sales_with_timestamps AS (
+    SELECT
+        TO_TIMESTAMP(
+            CONCAT(year, '-', month, '-', day, ' ', "timestamp"),
+            'YYYY-MM-DD HH24:MI:SS.MS'
+        ) AS full_timestamp,
+        year
+    FROM dim_date_times
+),
+sales_with_lead AS (
+    SELECT
+        year,
+        full_timestamp,
+        LEAD(full_timestamp) OVER (ORDER BY full_timestamp) AS next_sale_timestamp
+    FROM sales_with_timestamps
+)
+SELECT
+    year,
+    AVG(next_sale_timestamp - full_timestamp) AS avg_time_diff
+FROM sales_with_lead
+WHERE next_sale_timestamp IS NOT NULL
+GROUP BY year;
+
+-- 1.2 After: precomputed timestamps, one LEAD() per yearly partition
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT
+    sales_years.year,
+    yearly_gaps.avg_time_diff
+FROM (
+    SELECT DISTINCT EXTRACT(YEAR FROM year_month)::INT AS year
+    FROM dim_date_times
+) AS sales_years
+CROSS JOIN LATERAL (
+    SELECT
+        AVG(next_sale_timestamp - full_timestamp) AS avg_time_diff
+    FROM (
+        SELECT
+            full_timestamp,
+            LEAD(full_timestamp) OVER (ORDER BY full_timestamp) AS next_sale_timestamp
+        FROM dim_orders_table
+        WHERE year_month >= MAKE_DATE(sales_years.year, 1, 1)
+            AND year_month < MAKE_DATE(sales_years.year + 1, 1, 1)
+    ) AS sales_with_lead
+    WHERE next_sale_timestamp IS NOT NULL
+) AS yearly_gaps;
+
+-- 2. Time-bounded sales total (first quarter of 2022)
+-- 2.1 Before: join every order to dim_date_times and filter on string columns
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT
+    SUM(dpt.product_price * dot.product_quantity) AS total_sales
+FROM
+    dim_orders_table AS dot
+JOIN
+    dim_date_times AS ddt ON dot.date_uuid = ddt.date_uuid
+JOIN
+    dim_products AS dpt ON dot.product_code = dpt.product_code
+WHERE
+    ddt.year = '2022'
+    AND ddt.month IN ('1', '2', '3', '01', '02', '03');
+
+-- 2.2 After: filter on the partition key, only the 2022 partition is scanned
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT
+    SUM(dpt.product_price * dot.product_quantity) AS total_sales
+FROM
+    dim_orders_table AS dot
+JOIN
+    dim_products AS dpt ON dot.product_code = dpt.product_code
+WHERE
+    dot.year_month >= DATE '2022-01-01'
+    AND dot.year_month < DATE '2022-04-01';
@@ -128,7 +128,11 @@ ALTER TABLE dim_date_times
     ALTER COLUMN year TYPE VARCHAR(4),
     ALTER COLUMN day TYPE VARCHAR(2),
     ALTER COLUMN time_period TYPE VARCHAR(10),
-    ALTER COLUMN date_uuid TYPE UUID USING date_uuid::UUID;
+    ALTER COLUMN date_uuid TYPE UUID USING date_uuid::UUID,
+    ALTER COLUMN full_timestamp TYPE TIMESTAMPTZ USING full_timestamp::TIMESTAMPTZ,
+    ALTER COLUMN full_timestamp SET NOT NULL,
+    ALTER COLUMN year_month TYPE DATE USING year_month::DATE,
+    ALTER COLUMN year_month SET NOT NULL;
 
 -- 7. UPDATE DIM_CARD_DETAILS TABLE
 -- 7.1 Identify max column lengths
@@ -171,7 +175,76 @@ SELECT COUNT(*), COUNT(DISTINCT user_uuid) FROM dim_users;
 
 ALTER TABLE dim_users ADD PRIMARY KEY (user_uuid)
 
--- 9. ADD FOREIGN KEYS TO ORDERS TABLE
+-- 9. PARTITION DIM_ORDERS_TABLE BY YEAR_MONTH
+-- Rebuilds the orders fact as a table range-partitioned on the year_month key from
+-- dim_date_times (one partition per year), so time-bounded queries only scan the
+-- partitions they need. Must run before the foreign keys in section 10 are added.
+-- 9.1-9.4 run in one transaction, so if any order would be lost the whole move is
+-- rolled back and dim_orders_table is left as it was.
+BEGIN;
+
+-- 9.1 Move the uploaded heap table aside
+ALTER TABLE dim_orders_table RENAME TO dim_orders_staging;
+
+-- 9.2 Create the partitioned table with the timestamp and partition key columns
+CREATE TABLE dim_orders_table (
+    LIKE dim_orders_staging INCLUDING DEFAULTS,
+    full_timestamp TIMESTAMPTZ NOT NULL,
+    year_month DATE NOT NULL
+) PARTITION BY RANGE (year_month);
+
+-- 9.3 Create one partition per year present in dim_date_times, plus a default partition
+DO $$
+DECLARE
+    partition_year INT;
+BEGIN
+    FOR partition_year IN
+        SELECT DISTINCT EXTRACT(YEAR FROM year_month)::INT FROM dim_date_times
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE dim_orders_table_%s PARTITION OF dim_orders_table FOR VALUES FROM (%L) TO (%L)',
+            partition_year, make_date(partition_year, 1, 1), make_date(partition_year + 1, 1, 1)
+        );
+    END LOOP;
+END $$;
+
+CREATE TABLE dim_orders_table_default PARTITION OF dim_orders_table DEFAULT;
+
+-- 9.4 Load orders with their timestamp and key, then drop the staging table
+INSERT INTO dim_orders_table
+SELECT
+    dos.*,
+    ddt.full_timestamp,
+    ddt.year_month
+FROM
+    dim_orders_staging AS dos
+JOIN
+    dim_date_times AS ddt ON dos.date_uuid = ddt.date_uuid;
+
+-- Abort if any order was lost in the move (e.g. a date_uuid missing from dim_date_times)
+DO $$
+DECLARE
+    staging_count BIGINT;
+    partitioned_count BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO staging_count FROM dim_orders_staging;
+    SELECT COUNT(*) INTO partitioned_count FROM dim_orders_table;
+    IF staging_count <> partitioned_count THEN
+        RAISE EXCEPTION 'dim_orders_table partitioning lost % of % orders (date_uuid not in dim_date_times)',
+            staging_count - partitioned_count, staging_count;
+    END IF;
+END $$;
+
+DROP TABLE dim_orders_staging;
+
+COMMIT;
+
+-- 9.5 Index timestamps within each partition and refresh planner statistics
+CREATE INDEX ON dim_orders_table (full_timestamp);
+
+ANALYZE dim_orders_table;
+
+-- 10. ADD FOREIGN KEYS TO ORDERS TABLE
 
 -- card_details fk
 ALTER TABLE dim_orders_table
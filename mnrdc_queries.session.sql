@@ -147,39 +147,34 @@ ORDER BY
     total_sales;
 
 -- 9. Calculate average time between transactions
+-- Runs LEAD() separately for each year of dim_orders_table. The LATERAL subquery
+-- is bounded to one year of year_month, so only that year's partition is scanned
+-- (runtime partition pruning), and its rows can be read in order from the
+-- full_timestamp index instead of sorting every order at once.
+-- The gap from the last sale of a year to the first sale of the next is not counted.
 
-WITH sales_with_timestamps AS (
+WITH avg_diffs_by_year AS (
     SELECT
-        TO_TIMESTAMP(
-            CONCAT(year, '-', month, '-', day, ' ', "timestamp"),
-            'YYYY-MM-DD HH24:MI:SS.MS'
-        ) AS full_timestamp,
-        year
-    FROM dim_date_times
-),
-
-sales_with_lead AS (
-    SELECT
-        year,
-        full_timestamp,
-        LEAD(full_timestamp) OVER (ORDER BY full_timestamp) AS next_sale_timestamp
-    FROM sales_with_timestamps
-),
-
-sales_differences AS (
-    SELECT
-        year,
-        next_sale_timestamp - full_timestamp AS time_diff
-    FROM sales_with_lead
-    WHERE next_sale_timestamp IS NOT NULL
-),
-
-avg_diffs_by_year AS (
-    SELECT
-        year,
-        AVG(time_diff) AS avg_time_diff
-    FROM sales_differences
-    GROUP BY year
+        sales_years.year,
+        yearly_gaps.avg_time_diff
+    FROM (
+        SELECT DISTINCT EXTRACT(YEAR FROM year_month)::INT AS year
+        FROM dim_date_times
+    ) AS sales_years
+    CROSS JOIN LATERAL (
+        SELECT
+            AVG(next_sale_timestamp - full_timestamp) AS avg_time_diff
+        FROM (
+            SELECT
+                full_timestamp,
+                LEAD(full_timestamp) OVER (ORDER BY full_timestamp) AS next_sale_timestamp
+            FROM dim_orders_table
+            WHERE year_month >= MAKE_DATE(sales_years.year, 1, 1)
+                AND year_month < MAKE_DATE(sales_years.year + 1, 1, 1)
+        ) AS sales_with_lead
+        WHERE next_sale_timestamp IS NOT NULL
+    ) AS yearly_gaps
+    WHERE yearly_gaps.avg_time_diff IS NOT NULL
 )
 
 SELECT
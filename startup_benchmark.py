@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+# Runs in a fresh interpreter under -X importtime. It blocks network access,
+# points the database credentials at a closed local port and answers 'N' to the
+# upload prompt, then runs the real job until its first I/O fails. Every module
+# the job imports up to that point is therefore measured, and nothing else.
+JOB_HARNESS = """
+import builtins, socket, sys
+
+def _no_network(*args, **kwargs):
+    raise OSError("network disabled by startup_benchmark")
+
+socket.socket.connect = _no_network
+builtins.input = lambda prompt='': 'n'
+sys.stderr.write("startup_benchmark: job starts\\n")
+
+# Errors raised when a job's first connection or download is refused. Matched by
+# name so the harness doesn't import SQLAlchemy or botocore itself. requests'
+# ConnectionError is an OSError.
+REFUSED_CONNECTION_ERRORS = {"sqlalchemy.exc.OperationalError", "botocore.exceptions.ConnectionError"}
+
+def _is_refused_connection(error):
+    return isinstance(error, OSError) or any(
+        f"{cls.__module__}.{cls.__qualname__}" in REFUSED_CONNECTION_ERRORS for cls in type(error).__mro__)
+
+import main
+main.yaml_directory = main.local_yaml_directory = sys.argv[1]
+for name in sys.argv[2:]:
+    try:
+        main.run_subcommand(name, main.MemoryBudget())
+    except Exception as error:
+        # Anything else (a missing module, a bug in the job) fails the benchmark
+        # rather than being reported as a shorter import time
+        if not _is_refused_connection(error):
+            raise
+"""
+
+JOB_START_MARKER = "startup_benchmark: job starts"
+
+# Points init_db_engine at a port nothing listens on, so SQLAlchemy loads its
+# psycopg2 dialect and then fails to connect straight away
+OFFLINE_DB_CREDS = """RDS_USER: benchmark
+RDS_PASSWORD: benchmark
+RDS_HOST: 127.0.0.1
+RDS_PORT: 1
+RDS_DATABASE: benchmark
+"""
+
+
+def measure_import_time(subcommands, creds_path):
+    """
+    Runs the given main.py subcommands in a fresh interpreter with `-X importtime`
+    and parses the report.
+
+    Args:
+        subcommands (list): Subcommand names to run in turn. An empty list only imports main.
+        creds_path (str): Path to the offline database credentials YAML file.
+
+    Returns:
+        tuple: (total cold-start import time in ms, list of (cumulative ms, module) for
+        the top-level imports, slowest first).
+    """
+    env = dict(os.environ, AWS_ACCESS_KEY_ID="benchmark", AWS_SECRET_ACCESS_KEY="benchmark",
+               AWS_EC2_METADATA_DISABLED="true", AWS_MAX_ATTEMPTS="1")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", JOB_HARNESS, creds_path] + subcommands,
+                            capture_output=True, text=True, env=env, stdin=subprocess.DEVNULL,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    top_level = []
+    job_started = False
+    for line in result.stderr.splitlines():
+        if line == JOB_START_MARKER:
+            job_started = True
+            continue
+        # Skip the interpreter's own start-up and the harness's imports, and header lines
+        if not job_started or not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|")
+        # Nested imports are indented under their parent, so only unindented
+        # entries are counted towards the total.
+        if not package.startswith("  "):
+            top_level.append((int(cumulative) / 1000, package.strip()))
+
+    total_ms = sum(ms for ms, _ in top_level)
+    return total_ms, sorted(top_level, reverse=True)
+
+
+def main():
+    """
+    Prints the import time of each main.py subcommand and its three slowest imports.
+    'menu' only imports main.py, and 'all' runs every job in one process, which is
+    roughly what importing main.py cost before imports were made lazy.
+    Pass subcommand names as arguments to benchmark only those.
+    """
+    import main as mnrdc_main
+
+    subcommands = {name: [name] for name, _ in mnrdc_main.DATASETS.values()}
+    benchmarks = {"menu": [], **subcommands, "all": list(subcommands)}
+
+    names = sys.argv[1:] or list(benchmarks)
+    unknown = [name for name in names if name not in benchmarks]
+    if unknown:
+        print(f"Unknown subcommand(s): {', '.join(unknown)}. Choose from: {', '.join(benchmarks)}")
+        sys.exit(2)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as creds_file:
+        creds_file.write(OFFLINE_DB_CREDS)
+    try:
+        print(f"{'subcommand':<10} {'imports (ms)':>12}  slowest imports")
+        for name in names:
+            try:
+                total_ms, slowest = measure_import_time(benchmarks[name], creds_file.name)
+            except RuntimeError as e:
+                print(f"{name:<10} {'n/a':>12}  {e}")
+                continue
+            top = ", ".join(f"{module} {ms:.0f}ms" for ms, module in slowest[:3])
+            print(f"{name:<10} {total_ms:>12.1f}  {top}")
+    finally:
+        os.remove(creds_file.name)
+
+
+if __name__ == "__main__":
+    main()
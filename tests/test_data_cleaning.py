@@ -0,0 +1,31 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from data_cleaning import DataCleaning
+
+
+def make_events(timestamps):
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "month": ["9", "2"],
+        "year": ["2012", "1997"],
+        "day": ["19", "10"],
+        "time_period": ["Morning", "Evening"],
+        "date_uuid": ["3b7ca996-37f9-433f-b6d0-ce8391b615ad", "adc86836-6c35-49ca-bb0d-65b6507a00fa"],
+    })
+
+
+@pytest.mark.parametrize("timestamps", [
+    ["22:00:06", "09:05:17.5"],
+    # What pd.read_json returns for a column named 'timestamp' when every value parses
+    pd.to_datetime(["2026-10-19 22:00:06", "2026-10-19 09:05:17.5"], format="ISO8601"),
+])
+def test_clean_events_data_full_timestamp(timestamps):
+    cleaned = DataCleaning.clean_events_data(make_events(timestamps))
+
+    assert list(cleaned["full_timestamp"]) == [
+        pd.Timestamp("2012-09-19 22:00:06", tz="UTC"),
+        pd.Timestamp("1997-02-10 09:05:17.5", tz="UTC"),
+    ]
+    assert [str(key) for key in cleaned["year_month"]] == ["2012-09-01", "1997-02-01"]
@@ -0,0 +1,285 @@
+import io
+import os
+import sqlite3
+import subprocess
+import sys
+import types
+import uuid
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("ijson")
+
+from memory_utils import MemoryBudget
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Address space allowed on top of what the interpreter and libraries already use.
+# Loading any of the synthetic sources below in one go needs more than this.
+HEADROOM_BYTES = 256 * 1024 ** 2
+ORDERS_ROWS = 400_000
+PRODUCTS_ROWS = 400_000
+EVENTS_ROWS = 400_000
+
+# Runs main.py's job in a subprocess under RLIMIT_AS. The databases are SQLite files
+# standing in for RDS and the local database, and S3 downloads are copies from a local
+# directory; everything else (extraction, cleaning, chunking, upload) is the real code.
+PIPELINE_RUNNER = """
+import os, resource, shutil, sys
+import numpy, pandas, sqlalchemy, ijson, yaml
+import main
+from data_extraction import DataExtractor
+from database_utils import DatabaseConnector
+
+source_db, target_db, data_dir, headroom = sys.argv[1:5]
+
+DatabaseConnector.read_db_creds = lambda self: {"url": self.yaml_file}
+DatabaseConnector.init_db_engine = lambda self: sqlalchemy.create_engine(self.db_creds["url"])
+DataExtractor._download_from_s3 = staticmethod(
+    lambda bucket_name, bucket_file, local_path: bool(shutil.copy(os.path.join(data_dir, bucket_file), local_path)))
+main.yaml_directory = "sqlite:///" + source_db
+main.local_yaml_directory = "sqlite:///" + target_db
+
+with open("/proc/self/status") as status:
+    vm_size = next(int(line.split()[1]) * 1024 for line in status if line.startswith("VmSize"))
+limit = vm_size + int(headroom)
+resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+sys.argv = ["main.py"] + sys.argv[5:]
+main.main()
+"""
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs /proc and RLIMIT_AS")
+
+
+@pytest.fixture(scope="module")
+def pipeline_data(tmp_path_factory):
+    """Writes synthetic orders (SQLite), products (CSV) and events (JSON) sources."""
+    data_dir = tmp_path_factory.mktemp("data")
+    source_db = data_dir / "source.db"
+
+    orders_df = pd.DataFrame({
+        "level_0": range(ORDERS_ROWS),
+        "index": range(ORDERS_ROWS),
+        "Unnamed: 0": range(ORDERS_ROWS),
+        "date_uuid": [str(uuid.uuid4()) for _ in range(ORDERS_ROWS)],
+        "first_name": "Firstname",
+        "last_name": "Lastname",
+        "user_uuid": [str(uuid.uuid4()) for _ in range(ORDERS_ROWS)],
+        "card_number": [f"{4000000000000000 + i}" for i in range(ORDERS_ROWS)],
+        "store_code": [f"WEB-{i % 1000:08d}" for i in range(ORDERS_ROWS)],
+        "product_code": [f"A{i % 5000:04d}-{i % 97:02d}" for i in range(ORDERS_ROWS)],
+        "1": None,
+        "product_quantity": [i % 9 + 1 for i in range(ORDERS_ROWS)],
+    })
+    with sqlite3.connect(source_db) as connection:
+        orders_df.to_sql("orders_table", connection, index=False)
+    del orders_df
+
+    weights = ["500g", "1.5kg", "3 x 100g", "16oz", "250ml"]
+    products_df = pd.DataFrame({
+        "product_name": [f"Synthetic product number {i} with a long descriptive name" for i in range(PRODUCTS_ROWS)],
+        "product_price": [f"£{i % 100}.99" for i in range(PRODUCTS_ROWS)],
+        "weight": [weights[i % len(weights)] for i in range(PRODUCTS_ROWS)],
+        "category": "toys-and-games",
+        "EAN": [f"{7000000000000 + i}" for i in range(PRODUCTS_ROWS)],
+        "date_added": [f"20{i % 20 + 5:02d}-0{i % 9 + 1}-1{i % 9}" for i in range(PRODUCTS_ROWS)],
+        "uuid": [str(uuid.uuid4()) for _ in range(PRODUCTS_ROWS)],
+        "removed": "Still_avaliable",
+        "product_code": [f"p{i:07d}" for i in range(PRODUCTS_ROWS)],
+    })
+    products_df.to_csv(data_dir / "products.csv")
+    del products_df
+
+    time_periods = ["Evening", "Midday", "Morning", "Late_Hours"]
+    events_df = pd.DataFrame({
+        "timestamp": [f"{i % 24:02d}:{i % 60:02d}:{i % 59:02d}" for i in range(EVENTS_ROWS)],
+        "month": [str(i % 12 + 1) for i in range(EVENTS_ROWS)],
+        "year": [str(1993 + i % 30) for i in range(EVENTS_ROWS)],
+        "day": [str(i % 28 + 1) for i in range(EVENTS_ROWS)],
+        "time_period": [time_periods[i % 4] for i in range(EVENTS_ROWS)],
+        "date_uuid": [str(uuid.uuid4()) for _ in range(EVENTS_ROWS)],
+    })
+    # Rows the cleaner must remove: an invalid time_period, and an all-'NULL' row
+    events_df.loc[::1000, "time_period"] = "XK7Q2LM0ZB"
+    events_df.loc[500::1000, :] = "NULL"
+    events_df.to_json(data_dir / "date_details.json")
+    del events_df
+
+    return data_dir, source_db
+
+
+def run_pipeline(pipeline_data, tmp_path, job, *options):
+    """Runs one main.py job under the address-space limit, answering 'Y' to the upload prompt."""
+    data_dir, source_db = pipeline_data
+    target_db = tmp_path / "target.db"
+    result = subprocess.run(
+        [sys.executable, "-c", PIPELINE_RUNNER, str(source_db), str(target_db), str(data_dir),
+         str(HEADROOM_BYTES), job, *options],
+        input="y\n", capture_output=True, text=True, cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=REPO_DIR, OPENBLAS_NUM_THREADS="1"),
+    )
+    return result, target_db
+
+
+def uploaded_rows(target_db, table_name):
+    with sqlite3.connect(target_db) as connection:
+        return connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+
+
+@pytest.mark.parametrize("job, table_name, expected_rows", [
+    ("orders", "dim_orders_details", ORDERS_ROWS),
+    ("products", "dim_products", PRODUCTS_ROWS),
+    ("events", "dim_date_times", EVENTS_ROWS - 2 * (EVENTS_ROWS // 1000)),
+])
+def test_pipeline_fits_memory_budget(pipeline_data, tmp_path, job, table_name, expected_rows):
+    result, target_db = run_pipeline(pipeline_data, tmp_path, job, "--memory-budget", "64MB")
+
+    assert result.returncode == 0, result.stderr
+    assert "peak RSS" in result.stdout
+    assert uploaded_rows(target_db, table_name) == expected_rows
+
+
+def test_pipeline_without_budget_exceeds_limit(pipeline_data, tmp_path):
+    # Shows the limit is tight enough to matter: loading the table in one go fails
+    result, _ = run_pipeline(pipeline_data, tmp_path, "orders")
+
+    assert result.returncode != 0
+    assert "MemoryError" in result.stderr
+
+
+def test_parse_size_accepts_suffixes():
+    assert MemoryBudget.parse_size("512M") == MemoryBudget.parse_size("512MB") == 512 * 1024 ** 2
+    assert MemoryBudget.parse_size("2g") == 2 * 1024 ** 3
+    assert MemoryBudget.parse_size("1024") == 1024
+    with pytest.raises(ValueError):
+        MemoryBudget.parse_size("lots")
+    with pytest.raises(ValueError):
+        MemoryBudget.parse_size("0MB")
+
+
+def test_memory_budget_rejected_by_argparse():
+    result = subprocess.run([sys.executable, "main.py", "--memory-budget", "lots"],
+                            capture_output=True, text=True, cwd=REPO_DIR, stdin=subprocess.DEVNULL)
+
+    assert result.returncode == 2
+    assert "--memory-budget" in result.stderr
+
+
+def test_card_duplicates_removed_across_chunks():
+    from data_cleaning import DataCleaning
+
+    card_df = pd.DataFrame({
+        "card_number": ["4000?", "4001", "4000", "4002", "4001", "4003"],
+        "expiry_date": ["01/30"] * 6,
+        "card_provider": ["VISA 16 digit"] * 6,
+        "date_payment_confirmed": ["2020-01-01", "2020-01-02", "2020-01-01", "2020-01-03", "2020-01-02", "2020-01-04"],
+    })
+    whole = DataCleaning.clean_card_data(card_df.copy())
+
+    seen_rows = set()
+    chunks = [DataCleaning.clean_card_data(card_df.iloc[start:start + 2].copy(), seen_rows)
+              for start in range(0, len(card_df), 2)]
+    chunked = pd.concat(chunks)
+
+    assert chunked.reset_index(drop=True).equals(whole.reset_index(drop=True))
+
+
+def test_pdf_chunks_stay_within_page_count(monkeypatch):
+    pypdf = pytest.importorskip("pypdf")
+    requests = pytest.importorskip("requests")
+    from data_extraction import DataExtractor
+
+    page_count = 6
+    writer = pypdf.PdfWriter()
+    for _ in range(page_count):
+        writer.add_blank_page(width=100, height=100)
+    pdf_bytes = io.BytesIO()
+    writer.write(pdf_bytes)
+
+    class FakeResponse:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            yield pdf_bytes.getvalue()
+
+    requested_pages = []
+
+    def read_pdf(path, output_format, pages, pandas_options):
+        # Every chunk must be read as text so card_number has the same type throughout
+        assert pandas_options == {"dtype": str}
+        first, last = (int(page) for page in pages.split("-"))
+        assert 1 <= first <= last <= page_count
+        requested_pages.extend(range(first, last + 1))
+        # Page 3 has no table
+        return [pd.DataFrame({"card_number": [f"{page}-{row}" for row in range(50)]})
+                for page in range(first, last + 1) if page != 3]
+
+    monkeypatch.setattr(requests, "get", lambda url, stream: FakeResponse())
+    monkeypatch.setitem(sys.modules, "tabula", types.SimpleNamespace(read_pdf=read_pdf))
+
+    budget = MemoryBudget(1)
+    budget.chunk_rows = lambda bytes_per_row: 120 # About two and a half pages per chunk
+    card_df = pd.concat(DataExtractor.retrieve_pdf_data_in_chunks("http://example.com/cards.pdf", budget))
+
+    assert requested_pages == list(range(1, page_count + 1))
+    assert len(card_df) == 50 * (page_count - 1)
+
+
+def test_upload_stops_after_failed_chunk(monkeypatch):
+    import database_utils
+    import main
+
+    calls = []
+
+    class FailingConnector:
+        def __init__(self, yaml_file):
+            pass
+
+        def init_db_engine(self):
+            return None
+
+        def upload_to_db(self, df, table_name, engine=None, if_exists='replace'):
+            calls.append(if_exists)
+            return False
+
+    monkeypatch.setattr(database_utils, "DatabaseConnector", FailingConnector)
+    monkeypatch.setattr("builtins.input", lambda prompt: "y")
+    main.ask_and_upload([pd.DataFrame({"a": [1]})] * 3, "dim_test")
+
+    assert calls == ["replace"]
+
+
+def test_no_success_message_without_chunks(monkeypatch, capsys):
+    import main
+
+    monkeypatch.setattr("builtins.input", lambda prompt: pytest.fail("should not ask to upload"))
+    main.clean_and_upload(iter([]), "dim_test", "Events data", MemoryBudget())
+
+    output = capsys.readouterr().out
+    assert "successfully cleaned" not in output
+    assert "No events data was extracted" in output
+
+
+def test_csv_chunks_share_one_schema(monkeypatch, tmp_path):
+    from data_extraction import DataExtractor
+
+    # Numbers only in the first rows, text later: inferred per chunk this would be int64, then object
+    pd.DataFrame({"EAN": [str(i) for i in range(3000)] + ["not-a-number"] * 10}).to_csv(tmp_path / "products.csv")
+    monkeypatch.setattr(DataExtractor, "_download_from_s3", staticmethod(lambda *args: True))
+
+    budget = MemoryBudget(1)
+    budget.chunk_rows = lambda bytes_per_row: 1000
+    chunks = list(DataExtractor.extract_from_s3_in_chunks("bucket", "products.csv", str(tmp_path / "products.csv"), budget))
+
+    assert len(chunks) == 4
+    assert {str(chunk["EAN"].dtype) for chunk in chunks} == {"object"}